@@ -1,8 +1,11 @@
 import os
 import json
+import time
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from model_routing import MODEL_TIERS, validate_priorities, record_call
+
 # Load environment variables
 load_dotenv()
 
@@ -12,17 +15,22 @@ openai_api_key = os.getenv("OPENAI_API_KEY")
 # Initialize the OpenAI client
 client = OpenAI(api_key=openai_api_key)
 
-def generate_strategic_priorities(org_name: str, org_website: str):
+def generate_strategic_priorities(org_name: str, org_website: str, tier: str = "refine"):
     """
     Generate strategic priorities for an organization using OpenAI.
     
     Args:
         org_name: Name of the organization
         org_website: Website of the organization
+        tier: Model tier to use ("draft" or "refine", see model_routing)
         
     Returns:
         A list of priority dictionaries with 'priority', 'description', and 'definitions'
     """
+    start_time = time.perf_counter()
+    response = None
+    usage = None
+    
     try:
         # Validate API key
         if not openai_api_key:
@@ -64,11 +72,12 @@ def generate_strategic_priorities(org_name: str, org_website: str):
         
         # Call OpenAI API
         response = client.chat.completions.create(
-            model="gpt-4",
+            model=MODEL_TIERS[tier]["model"],
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
-            max_tokens=5000
+            max_tokens=MODEL_TIERS[tier]["max_tokens"]
         )
+        usage = response.usage
         
         # Extract content from response
         content = response.choices[0].message.content.strip()
@@ -82,11 +91,9 @@ def generate_strategic_priorities(org_name: str, org_website: str):
             if json_start >= 0 and json_end > json_start:
                 json_content = content[json_start:json_end]
                 priorities = json.loads(json_content)
-                return priorities
             else:
                 # If we can't find valid JSON brackets, try parsing the whole response
                 priorities = json.loads(content)
-                return priorities
                 
         except json.JSONDecodeError as e:
             print(f"Error parsing JSON from OpenAI response: {e}")
@@ -97,15 +104,28 @@ def generate_strategic_priorities(org_name: str, org_website: str):
                 # Replace single quotes with double quotes
                 content_fixed = content.replace("'", "\"")
                 priorities = json.loads(content_fixed)
-                return priorities
             except:
                 # If all parsing attempts fail, return None
                 print("All JSON parsing attempts failed")
-                return None
+                priorities = None
+        
+        if priorities is not None and not validate_priorities(priorities):
+            print("OpenAI response does not match the expected structure")
+            priorities = None
                 
     except Exception as e:
         print(f"Error generating priorities with OpenAI: {e}")
-        return None
+        priorities = None
+    
+    record_call(
+        tier,
+        time.perf_counter() - start_time,
+        prompt_tokens=usage.prompt_tokens if usage else 0,
+        completion_tokens=usage.completion_tokens if usage else 0,
+        valid=priorities is not None,
+        error=response is None
+    )
+    return priorities
 
 # Fallback function for when OpenAI is not available
 def generate_mock_priorities(org_name: str):
@@ -0,0 +1,220 @@
+import re
+import time
+
+import numpy as np
+from scipy import sparse
+
+# Cross-organization analytics over stored generations. All priorities are
+# turned into one sparse TF-IDF matrix; organization similarity and theme
+# clustering are then computed with batched matrix products instead of
+# pairwise Python loops.
+
+_WORD = re.compile(r"[a-z][a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+a about across all also an and any are as at be been by can city community county
+each ensure for from has have in including into is it its may more of on or our
+other such that the their these this through to town we which while will with within
+""".split())
+
+# Rows of the organization similarity matrix computed per block, to bound memory
+SIMILARITY_BLOCK_SIZE = 512
+
+# Upper bounds for request parameters, to keep a single request cheap
+MAX_TOP_K = 20
+MAX_CLUSTERS = 50
+
+
+def _priority_text(priority):
+    parts = [priority.get("priority", ""), priority.get("description", "")]
+    for definition in priority.get("definitions", []):
+        parts.append(definition.get("title", ""))
+        parts.append(definition.get("description", ""))
+    return " ".join(parts)
+
+
+def _normalize_rows(matrix):
+    """L2-normalize the rows of a sparse matrix."""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+def build_tfidf(documents, min_df=2):
+    """Build an L2-normalized sparse TF-IDF matrix for a list of texts.
+
+    Returns the (documents x terms) CSR matrix and the list of terms.
+    """
+    vocabulary = {}
+    rows = []
+    columns = []
+    for row, text in enumerate(documents):
+        term_ids = [
+            vocabulary.setdefault(word, len(vocabulary))
+            for word in _WORD.findall(text.lower())
+            if word not in STOP_WORDS
+        ]
+        rows.append(np.full(len(term_ids), row, dtype=np.int32))
+        columns.append(np.asarray(term_ids, dtype=np.int32))
+
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int32)
+    columns = np.concatenate(columns) if columns else np.empty(0, dtype=np.int32)
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+        shape=(len(documents), len(vocabulary))
+    )
+    counts.sum_duplicates()
+
+    # Drop terms that appear in fewer than min_df documents
+    document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+    if len(documents) > min_df:
+        keep = np.flatnonzero(document_frequency >= min_df)
+    else:
+        keep = np.arange(counts.shape[1])
+    counts = counts[:, keep]
+    document_frequency = document_frequency[keep]
+    terms = np.array(sorted(vocabulary, key=vocabulary.get), dtype=object)[keep]
+
+    # Sublinear term frequency and smoothed inverse document frequency
+    counts.data = 1.0 + np.log(counts.data)
+    idf = np.log((1.0 + len(documents)) / (1.0 + document_frequency)) + 1.0
+    tfidf = counts @ sparse.diags(idf.astype(np.float32))
+    return _normalize_rows(tfidf.tocsr()).astype(np.float32).tocsr(), list(terms)
+
+
+def top_similar(matrix, top_k=5):
+    """For each row of a normalized matrix, the top_k most similar other rows.
+
+    Returns (indices, scores), both of shape (rows x top_k).
+    """
+    n = matrix.shape[0]
+    top_k = max(0, min(top_k, n - 1))
+    indices = np.zeros((n, top_k), dtype=np.int64)
+    scores = np.zeros((n, top_k), dtype=np.float32)
+    if top_k == 0:
+        return indices, scores
+
+    transposed = matrix.T.tocsc()
+    for start in range(0, n, SIMILARITY_BLOCK_SIZE):
+        stop = min(start + SIMILARITY_BLOCK_SIZE, n)
+        block = (matrix[start:stop] @ transposed).toarray()
+        # Exclude each organization's similarity with itself
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        best = np.argpartition(-block, top_k - 1, axis=1)[:, :top_k]
+        best_scores = np.take_along_axis(block, best, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        indices[start:stop] = np.take_along_axis(best, order, axis=1)
+        scores[start:stop] = np.take_along_axis(best_scores, order, axis=1)
+    return indices, scores
+
+
+def spherical_kmeans(matrix, n_clusters, iterations=20, seed=0):
+    """Cluster the rows of a normalized sparse matrix by cosine similarity.
+
+    Returns (labels, centroids).
+    """
+    n = matrix.shape[0]
+    n_clusters = max(1, min(n_clusters, n))
+    rng = np.random.default_rng(seed)
+
+    # k-means++ style seeding, one cluster at a time over all rows at once
+    chosen = [int(rng.integers(n))]
+    closest = np.asarray((matrix @ matrix[chosen[0]].T).todense(), dtype=np.float64).ravel()
+    for _ in range(1, n_clusters):
+        distance = np.clip(1.0 - closest, 0, None)
+        total = distance.sum()
+        candidate = int(rng.choice(n, p=distance / total)) if total > 0 else int(rng.integers(n))
+        chosen.append(candidate)
+        closest = np.maximum(closest, np.asarray((matrix @ matrix[candidate].T).todense()).ravel())
+    centroids = matrix[chosen].toarray()
+
+    labels = np.full(n, -1)
+    for _ in range(iterations):
+        new_labels = np.asarray(matrix @ centroids.T).argmax(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+        # Centroid = normalized sum of the rows assigned to it
+        assignment = sparse.csr_matrix(
+            (np.ones(n, dtype=np.float32), (labels, np.arange(n))),
+            shape=(n_clusters, n)
+        )
+        sums = np.asarray((assignment @ matrix).todense())
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms.ravel() == 0
+        norms[empty] = 1.0
+        centroids = np.where(empty[:, None], centroids, sums / norms)
+    return labels, centroids
+
+
+def analyze_generations(generations, top_k=5, n_clusters=10, theme_terms=8, theme_examples=5):
+    """Compare the priorities of many organizations.
+
+    generations is a list of {"org_name": ..., "priorities": [...]} dicts,
+    one per organization. Returns the most similar peers of every
+    organization and the common priority themes across all of them.
+    """
+    start_time = time.perf_counter()
+    top_k = max(0, min(top_k, MAX_TOP_K))
+    n_clusters = max(1, min(n_clusters, MAX_CLUSTERS))
+
+    org_names = [generation["org_name"] for generation in generations]
+    documents = []
+    document_orgs = []
+    titles = []
+    for org_index, generation in enumerate(generations):
+        for priority in generation["priorities"]:
+            documents.append(_priority_text(priority))
+            document_orgs.append(org_index)
+            titles.append(priority.get("priority", ""))
+
+    if not documents:
+        return {"organizations": len(org_names), "priorities": 0, "terms": 0, "similar": {}, "themes": [], "seconds": 0.0}
+
+    document_orgs = np.asarray(document_orgs)
+    priority_matrix, terms = build_tfidf(documents)
+
+    # Organization vectors: normalized sum of their priority vectors
+    membership = sparse.csr_matrix(
+        (np.ones(len(documents), dtype=np.float32), (document_orgs, np.arange(len(documents)))),
+        shape=(len(org_names), len(documents))
+    )
+    org_matrix = _normalize_rows((membership @ priority_matrix).tocsr())
+
+    indices, scores = top_similar(org_matrix, top_k)
+    similar = {
+        org_names[i]: [
+            {"org_name": org_names[j], "score": round(float(score), 4)}
+            for j, score in zip(indices[i], scores[i])
+        ]
+        for i in range(len(org_names))
+    }
+
+    labels, centroids = spherical_kmeans(priority_matrix, n_clusters)
+    # Cosine similarity of every priority to its own theme
+    closeness = np.asarray(priority_matrix @ centroids.T)[np.arange(len(documents)), labels]
+
+    themes = []
+    for cluster in range(centroids.shape[0]):
+        members = np.flatnonzero(labels == cluster)
+        if len(members) == 0:
+            continue
+        top_terms = np.argsort(-centroids[cluster])[:theme_terms]
+        central = members[np.argsort(-closeness[members])[:theme_examples]]
+        themes.append({
+            "terms": [terms[t] for t in top_terms if centroids[cluster, t] > 0],
+            "priorities": int(len(members)),
+            "organizations": int(len(np.unique(document_orgs[members]))),
+            "examples": [{"org_name": org_names[document_orgs[m]], "priority": titles[m]} for m in central],
+        })
+    themes.sort(key=lambda theme: theme["organizations"], reverse=True)
+
+    return {
+        "organizations": len(org_names),
+        "priorities": len(documents),
+        "terms": len(terms),
+        "similar": similar,
+        "themes": themes,
+        "seconds": round(time.perf_counter() - start_time, 3),
+    }
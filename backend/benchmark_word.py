@@ -0,0 +1,47 @@
+"""Compare the fast template-based Word export with the python-docx path.
+
+Usage: python benchmark_word.py
+"""
+import time
+
+from export_renderers import render_word, render_word_python_docx
+from fast_docx import load_skeleton
+
+
+def make_priorities(count, definitions=5):
+    return [
+        {
+            "priority": f"Priority {i}",
+            "description": "Ensuring public safety and justice for all residents by protecting communities. " * 3,
+            "definitions": [
+                {
+                    "title": f"Result Definition {j}:",
+                    "description": "Prevent crime and respond quickly to emergencies through community-oriented policing. " * 2,
+                    "source": f"https://example.gov/department-{j}",
+                }
+                for j in range(definitions)
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def best_time(render, priorities, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        b"".join(render(priorities, "Example City"))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    load_skeleton()
+    print(f"{'priorities':>10} {'python-docx':>12} {'fast':>10} {'speedup':>8}")
+    for count in (5, 50, 500):
+        priorities = make_priorities(count)
+        repeat = 5 if count < 500 else 2
+        slow = best_time(render_word_python_docx, priorities, repeat)
+        fast = best_time(render_word, priorities, repeat)
+        print(f"{count:>10} {slow * 1000:>10.1f}ms {fast * 1000:>8.1f}ms {slow / fast:>7.1f}x")
@@ -0,0 +1,322 @@
+import io
+import csv
+import json
+import tempfile
+import textwrap
+from datetime import datetime
+
+from fast_docx import render_docx
+
+# Registry of export formats. Each renderer is a generator that takes
+# (priorities, org_name) and yields the output as chunks of bytes, so
+# lightweight formats can be streamed to the client row by row. Renderers
+# registered with sections=True also accept a section_cache dict in which
+# they keep the rendered output of each priority, keyed by its index.
+RENDERERS = {}
+
+
+def register_renderer(format_name, media_type, extension, streaming=True, sections=False):
+    """Register a renderer for an export format."""
+    def decorator(func):
+        RENDERERS[format_name] = {
+            "render": func,
+            "media_type": media_type,
+            "extension": extension,
+            "streaming": streaming,
+            "sections": sections,
+        }
+        return func
+    return decorator
+
+
+def get_renderer(format_name):
+    """Return the registry entry for a format, or None if it is unknown."""
+    return RENDERERS.get(format_name)
+
+
+def export_filename(format_name):
+    return f"strategic_priorities.{RENDERERS[format_name]['extension']}"
+
+
+def iter_export(format_name, priorities, org_name, section_cache=None):
+    """Yield the rendered export for a format as chunks of bytes."""
+    renderer = RENDERERS[format_name]
+    if section_cache is not None and renderer["sections"]:
+        return renderer["render"](priorities, org_name, section_cache=section_cache)
+    return renderer["render"](priorities, org_name)
+
+
+def write_export(format_name, priorities, org_name, stream):
+    """Write the rendered export to a binary stream."""
+    for chunk in iter_export(format_name, priorities, org_name):
+        stream.write(chunk)
+
+
+def write_export_file(format_name, priorities, org_name):
+    """Render an export to a temporary file and return its path."""
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f".{RENDERERS[format_name]['extension']}")
+    with temp_file:
+        write_export(format_name, priorities, org_name, temp_file)
+    return temp_file.name
+
+
+def _timestamp():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+@register_renderer(
+    "word",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "docx",
+    sections=True,
+)
+def render_word(priorities, org_name, section_cache=None):
+    """Render the priorities as a Word document using the fast template path."""
+    return render_docx(priorities, org_name, _timestamp(), section_cache)
+
+
+def render_word_python_docx(priorities, org_name):
+    """Render the priorities as a Word document with python-docx objects.
+
+    Reference implementation for render_word; much slower on large documents.
+    """
+    from docx import Document
+    doc = Document()
+
+    # Add a title
+    doc.add_heading(f'Strategic Priorities for {org_name}', 0)
+
+    # Add a timestamp
+    doc.add_paragraph(f'Generated on {_timestamp()}')
+
+    # Add each priority
+    for i, priority in enumerate(priorities):
+        doc.add_heading(f'Priority {i+1}: {priority["priority"]}', 1)
+        doc.add_paragraph(priority["description"])
+
+        doc.add_heading('Key Initiatives:', 2)
+        for definition in priority["definitions"]:
+            p = doc.add_paragraph()
+            p.add_run(f'{definition["title"]}').bold = True
+            p.add_run(f' {definition["description"]}')
+
+            # Add source if available
+            if "source" in definition and definition["source"]:
+                source_p = doc.add_paragraph(f'Source: {definition["source"]}')
+                source_p.style = 'Caption'
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    yield buffer.getvalue()
+
+
+@register_renderer(
+    "excel",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "xlsx",
+    streaming=False,
+)
+def render_excel(priorities, org_name):
+    """Render the priorities as an Excel spreadsheet with openpyxl."""
+    import openpyxl
+    from openpyxl.styles import Font
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Strategic Priorities"
+
+    # Add a title
+    ws['A1'] = f'Strategic Priorities for {org_name}'
+    ws['A1'].font = Font(size=16, bold=True)
+    ws.merge_cells('A1:E1')
+
+    # Add a timestamp
+    ws['A2'] = f'Generated on {_timestamp()}'
+    ws.merge_cells('A2:E2')
+
+    # Add headers
+    headers = ['Priority', 'Description', 'Initiative', 'Details', 'Source']
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=3, column=col, value=header)
+        cell.font = Font(bold=True)
+
+    # Add data
+    row = 4
+    for priority in priorities:
+        for i, definition in enumerate(priority['definitions']):
+            if i == 0:
+                # First row of a priority includes priority title and description
+                ws.cell(row=row, column=1, value=priority['priority'])
+                ws.cell(row=row, column=2, value=priority['description'])
+            else:
+                # Subsequent rows of the same priority have empty cells for priority and description
+                ws.cell(row=row, column=1, value='')
+                ws.cell(row=row, column=2, value='')
+
+            # Add initiative details
+            ws.cell(row=row, column=3, value=definition['title'])
+            ws.cell(row=row, column=4, value=definition['description'])
+
+            # Add source if available
+            if "source" in definition:
+                ws.cell(row=row, column=5, value=definition.get('source', ''))
+
+            row += 1
+
+    # Auto-adjust column widths
+    for col in range(1, 6):
+        ws.column_dimensions[openpyxl.utils.get_column_letter(col)].width = 30
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    yield buffer.getvalue()
+
+
+@register_renderer("csv", "text/csv", "csv")
+def render_csv(priorities, org_name):
+    """Render one CSV row per result definition."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # Header row, prefixed with a byte order mark so Excel opens the file as UTF-8
+    writer.writerow(['Organization', 'Priority', 'Description', 'Initiative', 'Details', 'Source'])
+    yield ('\ufeff' + buffer.getvalue()).encode('utf-8')
+
+    for priority in priorities:
+        buffer.seek(0)
+        buffer.truncate()
+        for definition in priority['definitions']:
+            writer.writerow([
+                org_name,
+                priority['priority'],
+                priority['description'],
+                definition['title'],
+                definition['description'],
+                definition.get('source', ''),
+            ])
+        yield buffer.getvalue().encode('utf-8')
+
+
+@register_renderer("ndjson", "application/x-ndjson", "ndjson")
+def render_ndjson(priorities, org_name):
+    """Render one JSON object per priority, one per line."""
+    for priority in priorities:
+        record = {"org_name": org_name}
+        record.update(priority)
+        yield (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+@register_renderer("markdown", "text/markdown", "md")
+def render_markdown(priorities, org_name):
+    """Render the priorities as a Markdown document."""
+    yield f"# Strategic Priorities for {org_name}\n\nGenerated on {_timestamp()}\n".encode('utf-8')
+
+    for i, priority in enumerate(priorities):
+        lines = [
+            "",
+            f"## Priority {i+1}: {priority['priority']}",
+            "",
+            priority['description'],
+            "",
+            "### Key Initiatives:",
+            "",
+        ]
+        for definition in priority['definitions']:
+            lines.append(f"- **{definition['title']}** {definition['description']}")
+            if definition.get('source'):
+                lines.append(f"  *Source: {definition['source']}*")
+        yield ("\n".join(lines) + "\n").encode('utf-8')
+
+
+# Minimal PDF writer: Helvetica text with simple word wrapping. Pages are
+# written out as soon as they are full, so large documents stream in chunks.
+PDF_PAGE_WIDTH = 612
+PDF_PAGE_HEIGHT = 792
+PDF_MARGIN = 72
+
+
+def _pdf_escape(text):
+    text = text.encode('cp1252', 'replace').decode('cp1252')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _pdf_lines(priorities, org_name):
+    """Yield (font, size, text) lines, with None marking vertical spacing."""
+    yield ("F2", 18, f"Strategic Priorities for {org_name}")
+    yield ("F1", 10, f"Generated on {_timestamp()}")
+    for i, priority in enumerate(priorities):
+        yield None
+        yield ("F2", 14, f"Priority {i+1}: {priority['priority']}")
+        yield ("F1", 11, priority['description'])
+        yield None
+        yield ("F2", 12, "Key Initiatives:")
+        for definition in priority['definitions']:
+            yield ("F1", 11, f"{definition['title']} {definition['description']}")
+            if definition.get('source'):
+                yield ("F1", 9, f"Source: {definition['source']}")
+
+
+@register_renderer("pdf", "application/pdf", "pdf")
+def render_pdf(priorities, org_name):
+    """Render the priorities as a simple text PDF."""
+    offsets = {}
+    position = 0
+    page_ids = []
+    next_id = 5  # 1: catalog, 2: pages, 3: regular font, 4: bold font
+
+    def emit(obj_id, body):
+        nonlocal position
+        offsets[obj_id] = position
+        data = f"{obj_id} 0 obj\n".encode('latin-1') + body + b"\nendobj\n"
+        position += len(data)
+        return data
+
+    header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    position = len(header)
+    chunk = header
+    chunk += emit(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    chunk += emit(4, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+    yield chunk
+
+    def flush_page(commands):
+        nonlocal next_id
+        content = "\n".join(commands).encode('cp1252', 'replace')
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        page_ids.append(page_id)
+        data = emit(content_id, f"<< /Length {len(content)} >>\nstream\n".encode('latin-1') + content + b"\nendstream")
+        data += emit(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PDF_PAGE_WIDTH} {PDF_PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode('latin-1'))
+        return data
+
+    commands = []
+    y = PDF_PAGE_HEIGHT - PDF_MARGIN
+    for line in _pdf_lines(priorities, org_name):
+        if line is None:
+            y -= 8
+            continue
+        font, size, text = line
+        # Helvetica averages roughly half an em per character
+        width = max(20, int((PDF_PAGE_WIDTH - 2 * PDF_MARGIN) / (size * 0.5)))
+        for wrapped in textwrap.wrap(text, width) or [""]:
+            leading = size * 1.4
+            if y - leading < PDF_MARGIN:
+                yield flush_page(commands)
+                commands = []
+                y = PDF_PAGE_HEIGHT - PDF_MARGIN
+            y -= leading
+            commands.append(f"BT /{font} {size} Tf {PDF_MARGIN} {y:.1f} Td ({_pdf_escape(wrapped)}) Tj ET")
+    yield flush_page(commands)
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    chunk = emit(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode('latin-1'))
+    chunk += emit(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    xref_position = position
+    xref = [f"xref\n0 {next_id}\n", "0000000000 65535 f \n"]
+    for obj_id in range(1, next_id):
+        xref.append(f"{offsets[obj_id]:010d} 00000 n \n")
+    xref.append(f"trailer\n<< /Size {next_id} /Root 1 0 R >>\nstartxref\n{xref_position}\n%%EOF\n")
+    yield chunk + "".join(xref).encode('latin-1')
@@ -0,0 +1,195 @@
+import os
+import re
+import struct
+import time
+import zlib
+from xml.sax.saxutils import escape
+
+# Fast Word export. Instead of building every heading, paragraph and run as
+# python-docx objects, the document body is generated as escaped XML
+# fragments and zipped straight into the output together with the static
+# parts (styles, theme, settings...) of python-docx's default template.
+# The static parts are compressed once and reused for every document.
+
+DOCUMENT_PART = "word/document.xml"
+
+# Characters that are not allowed in XML 1.0 (python-docx rejects them too)
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_LINE_BREAKS = re.compile(r"(\t|\r\n|\n|\r)")
+
+_skeleton = None
+
+
+def _template_path():
+    import docx
+    return os.path.join(os.path.dirname(docx.__file__), "templates", "default.docx")
+
+
+def _dos_datetime(timestamp):
+    t = time.localtime(timestamp)
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+def _local_header(name, flags, dos_time, dos_date, crc, compressed_size, size):
+    encoded = name.encode("utf-8")
+    return struct.pack(
+        "<IHHHHHIIIHH", 0x04034B50, 20, flags, zlib.DEFLATED, dos_time, dos_date,
+        crc, compressed_size, size, len(encoded), 0
+    ) + encoded
+
+
+def _central_header(name, flags, dos_time, dos_date, crc, compressed_size, size, offset):
+    encoded = name.encode("utf-8")
+    return struct.pack(
+        "<IHHHHHHIIIHHHHHII", 0x02014B50, 20, 20, flags, zlib.DEFLATED, dos_time, dos_date,
+        crc, compressed_size, size, len(encoded), 0, 0, 0, 0, 0, offset
+    ) + encoded
+
+
+def _deflate(data):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def load_skeleton():
+    """Read the template once and precompress its static parts."""
+    global _skeleton
+    if _skeleton is not None:
+        return _skeleton
+
+    import zipfile
+    with zipfile.ZipFile(_template_path()) as template:
+        parts = [(info.filename, template.read(info.filename)) for info in template.infolist()]
+
+    document_xml = dict(parts)[DOCUMENT_PART].decode("utf-8")
+    body_start = document_xml.index("<w:body>") + len("<w:body>")
+    section_start = document_xml.index("<w:sectPr")
+
+    dos_time, dos_date = _dos_datetime(time.time())
+    local_entries = []
+    central_entries = []
+    offset = 0
+    for name, data in parts:
+        if name == DOCUMENT_PART:
+            continue
+        crc = zlib.crc32(data)
+        compressed = _deflate(data)
+        local = _local_header(name, 0, dos_time, dos_date, crc, len(compressed), len(data)) + compressed
+        central_entries.append(_central_header(name, 0, dos_time, dos_date, crc, len(compressed), len(data), offset))
+        local_entries.append(local)
+        offset += len(local)
+
+    _skeleton = {
+        "static_parts": b"".join(local_entries),
+        "static_central": b"".join(central_entries),
+        "static_count": len(central_entries),
+        "document_head": document_xml[:body_start],
+        "document_tail": document_xml[section_start:],
+    }
+    return _skeleton
+
+
+def _run(text, bold=False):
+    """XML for a run, with tabs and line breaks handled like python-docx."""
+    run_properties = "<w:rPr><w:b/></w:rPr>" if bold else ""
+    content = []
+    for piece in _LINE_BREAKS.split(_INVALID_XML_CHARS.sub("", text)):
+        if piece == "\t":
+            content.append("<w:tab/>")
+        elif piece in ("\r\n", "\n", "\r"):
+            content.append("<w:br/>")
+        elif piece:
+            content.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+    return f"<w:r>{run_properties}{''.join(content)}</w:r>"
+
+
+def _paragraph(runs, style=None):
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return f"<w:p>{properties}{''.join(runs)}</w:p>"
+
+
+def iter_body_xml(priorities, org_name, timestamp, section_cache=None):
+    """Yield the document body as XML fragments, one chunk per priority.
+
+    If a section_cache dict is given, the fragment for each priority is
+    cached under its index and reused while that index still holds the same
+    priority object, until the caller removes it.
+    """
+    yield (
+        _paragraph([_run(f"Strategic Priorities for {org_name}")], "Title")
+        + _paragraph([_run(f"Generated on {timestamp}")])
+    )
+
+    for i, priority in enumerate(priorities):
+        cached = section_cache.get(i) if section_cache is not None else None
+        if cached is not None and cached[0] is priority:
+            yield cached[1]
+            continue
+
+        fragments = [
+            _paragraph([_run(f'Priority {i+1}: {priority["priority"]}')], "Heading1"),
+            _paragraph([_run(priority["description"])]),
+            _paragraph([_run("Key Initiatives:")], "Heading2"),
+        ]
+        for definition in priority["definitions"]:
+            fragments.append(_paragraph([
+                _run(f'{definition["title"]}', bold=True),
+                _run(f' {definition["description"]}'),
+            ]))
+            if "source" in definition and definition["source"]:
+                fragments.append(_paragraph([_run(f'Source: {definition["source"]}')], "Caption"))
+        fragment = "".join(fragments)
+        if section_cache is not None:
+            section_cache[i] = (priority, fragment)
+        yield fragment
+
+
+def render_docx(priorities, org_name, timestamp, section_cache=None):
+    """Yield a complete .docx file as chunks of bytes."""
+    skeleton = load_skeleton()
+    static_parts = skeleton["static_parts"]
+    dos_time, dos_date = _dos_datetime(time.time())
+
+    # Build the body before yielding anything, so malformed priorities raise
+    # before a caller starts sending the file. Only the compression streams.
+    fragments = list(iter_body_xml(priorities, org_name, timestamp, section_cache))
+
+    # The document part is streamed, so its CRC and sizes follow the data
+    document_offset = len(static_parts)
+    yield static_parts + _local_header(DOCUMENT_PART, 0x08, dos_time, dos_date, 0, 0, 0)
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    crc = 0
+    size = 0
+    compressed_size = 0
+
+    def compress(text):
+        nonlocal crc, size, compressed_size
+        data = text.encode("utf-8")
+        crc = zlib.crc32(data, crc)
+        size += len(data)
+        chunk = compressor.compress(data)
+        compressed_size += len(chunk)
+        return chunk
+
+    chunk = compress(skeleton["document_head"])
+    for fragment in fragments:
+        chunk += compress(fragment)
+        if chunk:
+            yield chunk
+            chunk = b""
+    chunk += compress(skeleton["document_tail"])
+    tail = compressor.flush()
+    compressed_size += len(tail)
+    chunk += tail
+
+    descriptor = struct.pack("<IIII", 0x08074B50, crc, compressed_size, size)
+    central_offset = document_offset + len(_local_header(DOCUMENT_PART, 0, 0, 0, 0, 0, 0)) + compressed_size + len(descriptor)
+    central = skeleton["static_central"] + _central_header(
+        DOCUMENT_PART, 0x08, dos_time, dos_date, crc, compressed_size, size, document_offset
+    )
+    entry_count = skeleton["static_count"] + 1
+    end_record = struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, entry_count, entry_count, len(central), central_offset, 0)
+    yield chunk + descriptor + central + end_record
@@ -1,2 +1,9 @@
-from generate_word import create_word
-from backend.generate_excel import create_excel
+from export_renderers import write_export_file
+
+def create_word(priorities, org_name="Your Organization"):
+    """Write the priorities to a Word document and return the file path."""
+    return write_export_file("word", priorities, org_name)
+
+def create_excel(priorities, org_name="Your Organization"):
+    """Write the priorities to an Excel spreadsheet and return the file path."""
+    return write_export_file("excel", priorities, org_name)
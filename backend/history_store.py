@@ -0,0 +1,237 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+
+# Persistent generation history in a local SQLite database. Every stored
+# result is kept in the generations table, and each of its priorities is
+# indexed in an FTS5 table for full-text search over titles, descriptions
+# and definition text.
+HISTORY_DB_PATH = os.getenv(
+    "HISTORY_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "generation_history.db")
+)
+
+# FTS rows use rowid = generation rowid * FTS_ROWID_STRIDE + priority index,
+# so the rows of one generation can be replaced with a cheap rowid range
+FTS_ROWID_STRIDE = 1000
+
+MAX_PAGE_SIZE = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    generation_id TEXT NOT NULL UNIQUE,
+    org_name TEXT NOT NULL,
+    org_website TEXT NOT NULL,
+    model TEXT,
+    route TEXT,
+    prompt_version TEXT,
+    priorities TEXT NOT NULL,
+    timings TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS generations_org ON generations (org_name, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS priorities_fts USING fts5 (
+    title,
+    description,
+    definitions,
+    tokenize = 'porter unicode61'
+);
+"""
+
+_lock = threading.Lock()
+_connection = None
+
+
+def _connect():
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(HISTORY_DB_PATH, check_same_thread=False)
+        _connection.row_factory = sqlite3.Row
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute("PRAGMA synchronous=NORMAL")
+        _connection.executescript(_SCHEMA)
+    return _connection
+
+
+def save_generation(generation_id, org_name, org_website, priorities, model=None, route=None,
+                    prompt_version=None, timings=None):
+    """Insert or update a generation and re-index its priorities."""
+    now = time.time()
+    with _lock:
+        db = _connect()
+        with db:
+            db.execute(
+                """
+                INSERT INTO generations (generation_id, org_name, org_website, model, route, prompt_version,
+                                         priorities, timings, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (generation_id) DO UPDATE SET
+                    model = excluded.model,
+                    priorities = excluded.priorities,
+                    timings = excluded.timings,
+                    updated_at = excluded.updated_at
+                """,
+                (generation_id, org_name, org_website, model, route, prompt_version,
+                 json.dumps(priorities), json.dumps(timings or {}), now, now)
+            )
+            row_id = db.execute("SELECT id FROM generations WHERE generation_id = ?", (generation_id,)).fetchone()[0]
+
+            base = row_id * FTS_ROWID_STRIDE
+            db.execute("DELETE FROM priorities_fts WHERE rowid BETWEEN ? AND ?", (base, base + FTS_ROWID_STRIDE - 1))
+            db.executemany(
+                "INSERT INTO priorities_fts (rowid, title, description, definitions) VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        base + index,
+                        priority.get("priority", ""),
+                        priority.get("description", ""),
+                        "\n".join(
+                            f'{definition.get("title", "")} {definition.get("description", "")}'
+                            for definition in priority.get("definitions", [])
+                        ),
+                    )
+                    for index, priority in enumerate(priorities[:FTS_ROWID_STRIDE])
+                ]
+            )
+    return row_id
+
+
+def _summary(row):
+    priorities = json.loads(row["priorities"])
+    return {
+        "id": row["id"],
+        "generation_id": row["generation_id"],
+        "org_name": row["org_name"],
+        "org_website": row["org_website"],
+        "model": row["model"],
+        "route": row["route"],
+        "prompt_version": row["prompt_version"],
+        "created_at": row["created_at"],
+        "priorities": [priority.get("priority") for priority in priorities],
+    }
+
+
+def list_generations(limit=20, before=None, org_name=None):
+    """Newest generations first, paginated with the id of the last item seen."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = "SELECT * FROM generations"
+    conditions = []
+    params = []
+    if org_name:
+        conditions.append("org_name = ?")
+        params.append(org_name)
+    if before is not None:
+        conditions.append("id < ?")
+        params.append(before)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    with _lock:
+        rows = _connect().execute(query, params).fetchall()
+
+    items = [_summary(row) for row in rows[:limit]]
+    next_before = items[-1]["id"] if len(rows) > limit else None
+    return {"items": items, "next_before": next_before}
+
+
+def get_generation(generation_id):
+    """Return a stored generation with its full priorities, or None."""
+    with _lock:
+        row = _connect().execute("SELECT * FROM generations WHERE generation_id = ?", (generation_id,)).fetchone()
+    if row is None:
+        return None
+    record = dict(row)
+    record["priorities"] = json.loads(record["priorities"])
+    record["timings"] = json.loads(record["timings"] or "{}")
+    return record
+
+
+def latest_generation():
+    """Return the most recently stored generation, or None."""
+    with _lock:
+        row = _connect().execute("SELECT generation_id FROM generations ORDER BY id DESC LIMIT 1").fetchone()
+    return get_generation(row["generation_id"]) if row else None
+
+
+def latest_per_org(org_names=None, limit=None):
+    """Return the latest generation of each organization, newest first."""
+    query = "SELECT generation_id, org_name, org_website, priorities FROM generations WHERE id IN (SELECT MAX(id) FROM generations"
+    params = []
+    if org_names:
+        query += f" WHERE org_name IN ({', '.join('?' for _ in org_names)})"
+        params.extend(org_names)
+    query += " GROUP BY org_name) ORDER BY id DESC"
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    with _lock:
+        rows = _connect().execute(query, params).fetchall()
+    return [
+        {
+            "generation_id": row["generation_id"],
+            "org_name": row["org_name"],
+            "org_website": row["org_website"],
+            "priorities": json.loads(row["priorities"]),
+        }
+        for row in rows
+    ]
+
+
+def _match_expression(text):
+    """Turn free text into an FTS5 query that matches all of its words."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"' for word in words)
+
+
+def search_priorities(text, limit=20, before=None):
+    """Full-text search over priorities, newest first.
+
+    Paginated with the "cursor" of the last result seen.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    expression = _match_expression(text)
+    if not expression:
+        return {"results": [], "next_before": None}
+
+    query = """
+        SELECT priorities_fts.rowid AS cursor,
+               snippet(priorities_fts, -1, '[', ']', '...', 12) AS snippet,
+               g.generation_id, g.org_name, g.org_website, g.created_at, g.priorities
+        FROM priorities_fts
+        JOIN generations AS g ON g.id = priorities_fts.rowid / ?
+        WHERE priorities_fts MATCH ?
+    """
+    params = [FTS_ROWID_STRIDE, expression]
+    if before is not None:
+        query += " AND priorities_fts.rowid < ?"
+        params.append(before)
+    query += " ORDER BY priorities_fts.rowid DESC LIMIT ?"
+    params.append(limit + 1)
+
+    with _lock:
+        rows = _connect().execute(query, params).fetchall()
+
+    results = []
+    for row in rows[:limit]:
+        priority_index = row["cursor"] % FTS_ROWID_STRIDE
+        priorities = json.loads(row["priorities"])
+        results.append({
+            "cursor": row["cursor"],
+            "generation_id": row["generation_id"],
+            "org_name": row["org_name"],
+            "org_website": row["org_website"],
+            "created_at": row["created_at"],
+            "priority_index": priority_index,
+            "priority": priorities[priority_index].get("priority") if priority_index < len(priorities) else None,
+            "snippet": row["snippet"],
+        })
+    next_before = results[-1]["cursor"] if len(rows) > limit else None
+    return {"results": results, "next_before": next_before}
@@ -1,17 +1,38 @@
 import sys
 import os
-from fastapi import FastAPI, Body
+from fastapi import FastAPI, Body, BackgroundTasks, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-import tempfile
-from datetime import datetime
+from typing import List, Optional
 import json
+import asyncio
+import itertools
+import threading
+import time
+import uuid
 import httpx
 
 # Add the current directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from model_routing import MODEL_TIERS, resolve_route, validate_priorities, record_call, get_tier_stats
+from export_renderers import RENDERERS, get_renderer, iter_export, export_filename
+from json_responses import FastJSONResponse, json_response, get_serialization_stats
+import prerender
+import history_store
+import link_verifier
+import sqlite3
+
+# Cross-organization analytics needs numpy and scipy
+try:
+    import analytics
+    has_analytics = True
+except ImportError as e:
+    has_analytics = False
+    print(f"Analytics not available: {e}")
+    print("Please install them with: pip install numpy scipy")
+
 # Try to import OpenAI for AI-based generation
 try:
     from dotenv import load_dotenv
@@ -40,16 +61,107 @@ except ImportError as e:
 
 # Variable to store the last generated priorities and organization name
 last_generated = {
+    "generation_id": "",
+    "revision": 0,
     "org_name": "",
     "org_website": "",
+    "model": "",
+    "route": "",
+    "refinement": "",
+    "timings": {},
+    "link_check": {},
     "priorities": []
 }
 
+# Bump when the generation prompt changes, so stored history can be compared
+PROMPT_VERSION = "5x5-v1"
+
+# Time budget in seconds for the background check of definition source links
+LINK_CHECK_BUDGET = float(os.getenv("LINK_CHECK_BUDGET", "30"))
+
+# Requests run concurrently in the threadpool. Hold this lock to read a
+# consistent result or to change last_generated; a generation is built in
+# local variables and only installed once it has finished.
+result_lock = threading.Lock()
+
+# Rendered sections of the stored priorities, per export format and keyed by
+# priority index, so editing one priority only re-renders that section
+section_caches = {}
+
+def result_changed(clear_sections=True):
+    """Invalidate cached renders of the stored result, start pre-rendering it
+    and save it to the generation history. Call with result_lock held."""
+    last_generated["revision"] += 1
+    if clear_sections:
+        section_caches.clear()
+    prerender.schedule(result_key(), last_generated["priorities"], last_generated["org_name"], section_caches)
+    save_history(dict(last_generated))
+
+def save_history(result):
+    """Save a result to the generation history.
+    
+    Pass a snapshot taken under result_lock, not last_generated itself.
+    """
+    # Mock results are placeholders, keep them out of search and analytics
+    if result["model"] == "mock":
+        return
+    try:
+        history_store.save_generation(
+            result["generation_id"],
+            result["org_name"],
+            result["org_website"],
+            result["priorities"],
+            model=result["model"],
+            route=result["route"],
+            prompt_version=PROMPT_VERSION,
+            timings=result["timings"]
+        )
+    except sqlite3.Error as e:
+        print(f"Error saving generation history: {e}")
+
+def result_key():
+    return f'{last_generated["generation_id"]}:{last_generated["revision"]}'
+
+def current_result():
+    """Return a snapshot of the stored result that later changes don't affect."""
+    with result_lock:
+        return dict(last_generated, priorities=list(last_generated["priorities"]))
+
+def verify_result_links(generation_id):
+    """Background link check: annotate the stored definitions with their link status."""
+    with result_lock:
+        if last_generated["generation_id"] != generation_id:
+            return
+        priorities = last_generated["priorities"]
+        org_name = last_generated["org_name"]
+    
+    try:
+        summary = asyncio.run(link_verifier.annotate_priorities(priorities, LINK_CHECK_BUDGET))
+    except Exception as e:
+        print(f"Error verifying source links: {e}")
+        return
+    
+    with result_lock:
+        # The result was replaced while the links were being checked
+        if last_generated["priorities"] is not priorities:
+            return
+        last_generated["link_check"] = summary
+        save_history(dict(last_generated))
+    print(f"Source links checked for {org_name}: {summary}")
+
 class OrgData(BaseModel):
     org_name: str
     org_website: str
+    route: Optional[str] = None
 
-app = FastAPI()
+class RegenerateData(BaseModel):
+    priority_index: int
+    definition_index: Optional[int] = None
+    generation_id: Optional[str] = None
+    instructions: Optional[str] = None
+    tier: str = "draft"
+
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Configure CORS
 app.add_middleware(
@@ -61,18 +173,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Restore the most recent generation so downloads keep working after a restart
+try:
+    latest = history_store.latest_generation()
+    if latest:
+        for key in ("generation_id", "org_name", "org_website", "model", "route", "timings", "priorities"):
+            last_generated[key] = latest[key]
+        print(f"Restored last generation for {latest['org_name']} from history")
+except sqlite3.Error as e:
+    print(f"Error loading generation history: {e}")
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Strategic Priorities Generator API"}
 
-def generate_ai_priorities(org_name, org_website):
-    """Generate strategic priorities using OpenAI."""
+def generate_ai_priorities(org_name, org_website, tier="refine"):
+    """Generate strategic priorities using the OpenAI model of the given tier."""
     if not has_openai:
         print("OpenAI functionality not available")
         return None
     
+    tier_config = MODEL_TIERS[tier]
+    start_time = time.perf_counter()
+    response = None
+    usage = None
+    
     try:
-        print(f"Generating priorities for {org_name} using OpenAI...")
+        print(f"Generating priorities for {org_name} using {tier_config['model']} ({tier} tier)...")
         
         prompt = f"""
         Please identify EXACTLY 5 strategic priorities for {org_name} based on its website: {org_website}.
@@ -111,14 +238,15 @@ def generate_ai_priorities(org_name, org_website):
         
         # Call OpenAI API with system message and increased max_tokens
         response = client.chat.completions.create(
-            model="gpt-4",
+            model=tier_config["model"],
             messages=[
                 {"role": "system", "content": "You are a strategic planning expert who always provides exactly 5 strategic priorities with exactly 5 initiatives each when asked."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
-            max_tokens=3500  # Increased to allow for more content
+            max_tokens=tier_config["max_tokens"]
         )
+        usage = response.usage
         
         # Extract content from response
         content = response.choices[0].message.content.strip()
@@ -134,35 +262,91 @@ def generate_ai_priorities(org_name, org_website):
                 json_content = content[json_start:json_end]
                 priorities = json.loads(json_content)
                 print(f"Successfully parsed JSON with {len(priorities)} priorities")
-                return priorities
             else:
                 # If we can't find valid JSON brackets, try parsing the whole response
                 priorities = json.loads(content)
                 print(f"Successfully parsed full response as JSON with {len(priorities)} priorities")
-                return priorities
                 
         except json.JSONDecodeError as e:
             print(f"Error parsing JSON from OpenAI response: {e}")
             print(f"Response content: {content}")
-            return None
+            priorities = None
+        
+        if priorities is not None and not validate_priorities(priorities):
+            print(f"Response from {tier_config['model']} does not match the expected structure")
+            priorities = None
                 
     except Exception as e:
         print(f"Error generating priorities with OpenAI: {e}")
-        return None
+        priorities = None
+    
+    record_call(
+        tier,
+        time.perf_counter() - start_time,
+        prompt_tokens=usage.prompt_tokens if usage else 0,
+        completion_tokens=usage.completion_tokens if usage else 0,
+        valid=priorities is not None,
+        error=response is None
+    )
+    return priorities
+
+def refine_priorities(generation_id, org_name, org_website):
+    """Background refinement pass: upgrade a stored draft with the refine tier."""
+    global last_generated
+    
+    start_time = time.perf_counter()
+    refined = generate_ai_priorities(org_name, org_website, tier="refine")
+    refine_seconds = time.perf_counter() - start_time
+    
+    with result_lock:
+        # Only upgrade the result if it hasn't been replaced by a newer generation
+        if last_generated["generation_id"] != generation_id:
+            print(f"Discarding refinement for {org_name}: a newer generation has been stored")
+            return
+        
+        # Don't overwrite sections the user has regenerated in the meantime
+        if last_generated["refinement"] != "pending":
+            print(f"Discarding refinement for {org_name}: the result has been edited")
+            return
+        
+        if refined is None:
+            print(f"Refinement failed for {org_name}, keeping the draft")
+            last_generated["refinement"] = "failed"
+            return
+        
+        last_generated["priorities"] = refined
+        last_generated["model"] = MODEL_TIERS["refine"]["model"]
+        last_generated["refinement"] = "complete"
+        last_generated["timings"] = dict(last_generated["timings"], refine_seconds=round(refine_seconds, 3))
+        result_changed()
+    print(f"Refined priorities stored for {org_name}")
 
 @app.post("/generate")
-async def generate_priorities_endpoint(data: OrgData):
+def generate_priorities_endpoint(data: OrgData, background_tasks: BackgroundTasks, request: Request):
     """Generate strategic priorities for an organization."""
     global last_generated
     
-    # Store the organization info for later use in downloads
-    last_generated["org_name"] = data.org_name
-    last_generated["org_website"] = data.org_website
+    start_time = time.perf_counter()
+    route = resolve_route(data.route)
+    generation_id = uuid.uuid4().hex
+    refinement = ""
     
     # Try AI generation first (if available)
     ai_priorities = None
+    model = ""
     if has_openai:
-        ai_priorities = generate_ai_priorities(data.org_name, data.org_website)
+        if route in ("fast", "draft_refine"):
+            ai_priorities = generate_ai_priorities(data.org_name, data.org_website, tier="draft")
+            model = MODEL_TIERS["draft"]["model"]
+            
+            if ai_priorities is not None and route == "draft_refine":
+                refinement = "pending"
+                background_tasks.add_task(refine_priorities, generation_id, data.org_name, data.org_website)
+        
+        # Quality route, or the draft failed: use the larger model directly
+        if ai_priorities is None:
+            ai_priorities = generate_ai_priorities(data.org_name, data.org_website, tier="refine")
+            model = MODEL_TIERS["refine"]["model"]
     
     # If AI generation fails or isn't available, use mock data
     if ai_priorities is None:
@@ -324,196 +508,341 @@ async def generate_priorities_endpoint(data: OrgData):
                 ]
             }
         ]
+        model = "mock"
     else:
         # Use the AI-generated priorities
         priorities = ai_priorities
     
-    # Store the priorities for later use in downloads
-    last_generated["priorities"] = priorities
+    # Store the finished result for later use in downloads, in one step so
+    # concurrent generations can't mix their fields
+    with result_lock:
+        last_generated.update({
+            "generation_id": generation_id,
+            "revision": 0,
+            "org_name": data.org_name,
+            "org_website": data.org_website,
+            "model": model,
+            "route": route,
+            "refinement": refinement,
+            "timings": {"generate_seconds": round(time.perf_counter() - start_time, 3)},
+            "link_check": {},
+            "priorities": priorities
+        })
+        result_changed()
     
-    return {"priorities": priorities}
+    # Check the source links off the request path, after any refinement
+    background_tasks.add_task(verify_result_links, generation_id)
+    
+    return json_response(request, {
+        "priorities": priorities,
+        "generation_id": generation_id,
+        "model": model,
+        "route": route,
+        "refinement": refinement
+    })
 
-def create_simple_word_doc(priorities, org_name):
-    """Create a simple Word document with the strategic priorities."""
-    try:
-        from docx import Document
-        doc = Document()
-        
-        # Add a title
-        doc.add_heading(f'Strategic Priorities for {org_name}', 0)
-        
-        # Add a timestamp
-        doc.add_paragraph(f'Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+def regenerate_ai_section(org_name, priorities, priority_index, definition_index=None, instructions=None, tier="draft"):
+    """Regenerate one priority, or one definition of a priority, using OpenAI.
+    
+    The rest of the result is sent as compact context so the model avoids
+    duplicating what is already there. Returns the new section or None.
+    """
+    tier_config = MODEL_TIERS[tier]
+    priority = priorities[priority_index]
+    
+    if definition_index is None:
+        others = [p["priority"] for i, p in enumerate(priorities) if i != priority_index]
+        prompt = f"""
+        These are the strategic priorities of {org_name}: {json.dumps(others)}.
+        Write ONE new strategic priority to replace "{priority["priority"]}". It must not duplicate the priorities above.
+        Include a clear title, a description explaining why this priority exists and exactly {len(priority["definitions"])} result definitions that describe how it is achieved.
         
-        # Add each priority
-        for i, priority in enumerate(priorities):
-            doc.add_heading(f'Priority {i+1}: {priority["priority"]}', 1)
-            doc.add_paragraph(priority["description"])
-            
-            doc.add_heading('Key Initiatives:', 2)
-            for definition in priority["definitions"]:
-                p = doc.add_paragraph()
-                p.add_run(f'{definition["title"]}').bold = True
-                p.add_run(f' {definition["description"]}')
-                
-                # Add source if available
-                if "source" in definition and definition["source"]:
-                    source_p = doc.add_paragraph(f'Source: {definition["source"]}')
-                    source_p.style = 'Caption'
+        Return ONLY a JSON object with this structure:
+        {{"priority": "Priority Title", "description": "Description of the priority", "definitions": [{{"title": "Result Definition Title", "description": "Description of how this result is achieved", "source": "URL or section of the website (if available)"}}]}}
+        """
+    else:
+        definition = priority["definitions"][definition_index]
+        others = [d["title"] for i, d in enumerate(priority["definitions"]) if i != definition_index]
+        prompt = f"""
+        {org_name} has the strategic priority "{priority["priority"]}": {priority["description"]}
+        Its other result definitions are: {json.dumps(others)}.
+        Write ONE new result definition to replace "{definition["title"]}". It must not duplicate the definitions above.
         
-        # Save the document to a temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.docx')
-        doc.save(temp_file.name)
-        return temp_file.name
-    except ImportError:
-        print("python-docx library not found. Please install it with 'pip install python-docx'")
-        return None
-
-def create_simple_excel(priorities, org_name):
-    """Create a simple Excel file with the strategic priorities."""
+        Return ONLY a JSON object with this structure:
+        {{"title": "Result Definition Title", "description": "Description of how this result is achieved", "source": "URL or section of the website (if available)"}}
+        """
+    if instructions:
+        prompt += f"\nAdditional instructions: {instructions}\n"
+    
+    start_time = time.perf_counter()
+    response = None
+    usage = None
+    section = None
+    
     try:
-        import openpyxl
-        from openpyxl.styles import Font, Alignment
-        
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Strategic Priorities"
-        
-        # Add a title
-        ws['A1'] = f'Strategic Priorities for {org_name}'
-        ws['A1'].font = Font(size=16, bold=True)
-        ws.merge_cells('A1:E1')
-        
-        # Add a timestamp
-        ws['A2'] = f'Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
-        ws.merge_cells('A2:E2')
-        
-        # Add headers
-        headers = ['Priority', 'Description', 'Initiative', 'Details', 'Source']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=3, column=col, value=header)
-            cell.font = Font(bold=True)
-        
-        # Add data
-        row = 4
-        for priority in priorities:
-            for i, definition in enumerate(priority['definitions']):
-                if i == 0:
-                    # First row of a priority includes priority title and description
-                    ws.cell(row=row, column=1, value=priority['priority'])
-                    ws.cell(row=row, column=2, value=priority['description'])
-                else:
-                    # Subsequent rows of the same priority have empty cells for priority and description
-                    ws.cell(row=row, column=1, value='')
-                    ws.cell(row=row, column=2, value='')
-                
-                # Add initiative details
-                ws.cell(row=row, column=3, value=definition['title'])
-                ws.cell(row=row, column=4, value=definition['description'])
-                
-                # Add source if available
-                if "source" in definition:
-                    ws.cell(row=row, column=5, value=definition.get('source', ''))
-                
-                row += 1
+        response = client.chat.completions.create(
+            model=tier_config["model"],
+            messages=[
+                {"role": "system", "content": "You are a strategic planning expert who helps municipalities refine their strategic priorities."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=1000 if definition_index is None else 300
+        )
+        usage = response.usage
+        content = response.choices[0].message.content.strip()
         
-        # Auto-adjust column widths
-        for col in range(1, 6):
-            ws.column_dimensions[openpyxl.utils.get_column_letter(col)].width = 30
+        json_start = content.find('{')
+        json_end = content.rfind('}') + 1
+        section = json.loads(content[json_start:json_end] if json_start >= 0 else content)
         
-        # Save to a temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-        wb.save(temp_file.name)
-        return temp_file.name
-    except ImportError:
-        print("openpyxl library not found. Please install it with 'pip install openpyxl'")
-        return None
+        if definition_index is None:
+            valid = validate_priorities([section])
+        else:
+            valid = validate_priorities([{"priority": priority["priority"], "description": "", "definitions": [section]}])
+        if not valid:
+            print(f"Regenerated section from {tier_config['model']} does not match the expected structure")
+            section = None
+    except Exception as e:
+        print(f"Error regenerating section with OpenAI: {e}")
+        section = None
+    
+    record_call(
+        tier,
+        time.perf_counter() - start_time,
+        prompt_tokens=usage.prompt_tokens if usage else 0,
+        completion_tokens=usage.completion_tokens if usage else 0,
+        valid=section is not None,
+        error=response is None
+    )
+    return section
 
-@app.get("/download/word")
-async def download_word_endpoint():
-    """Download strategic priorities as a Word document."""
+@app.post("/regenerate")
+def regenerate_section_endpoint(data: RegenerateData, background_tasks: BackgroundTasks, request: Request):
+    """Regenerate a single priority or definition of the stored generation."""
     global last_generated
     
-    try:
-        # Use the stored organization name and priorities
-        org_name = last_generated["org_name"]
-        if not org_name:
-            org_name = "Your Organization"
-            
+    with result_lock:
         priorities = last_generated["priorities"]
-        if not priorities:
-            # Fallback data if nothing has been generated
-            priorities = [
-                {
-                    "priority": "Example Priority",
-                    "description": "This is an example priority. Please generate priorities first.",
-                    "definitions": [
-                        {
-                            "title": "Example Initiative:",
-                            "description": "This is an example initiative.",
-                            "source": "Example source"
-                        }
-                    ]
-                }
-            ]
-        
-        print(f"Creating Word document for '{org_name}' with {len(priorities)} priorities")
-        file_path = create_simple_word_doc(priorities, org_name)
+        generation_id = last_generated["generation_id"]
+        org_name = last_generated["org_name"]
+        refinement = last_generated["refinement"]
+    if not priorities:
+        return JSONResponse(status_code=404, content={"error": "Nothing has been generated yet"})
+    if data.generation_id and data.generation_id != generation_id:
+        return JSONResponse(status_code=409, content={"error": "The generation has been replaced by a newer one"})
+    if not 0 <= data.priority_index < len(priorities):
+        return JSONResponse(status_code=404, content={"error": f"Priority {data.priority_index} does not exist"})
+    definitions = priorities[data.priority_index]["definitions"]
+    if data.definition_index is not None and not 0 <= data.definition_index < len(definitions):
+        return JSONResponse(status_code=404, content={"error": f"Definition {data.definition_index} does not exist"})
+    if data.tier not in MODEL_TIERS:
+        return JSONResponse(status_code=400, content={"error": f"Unknown model tier '{data.tier}'"})
+    if not has_openai:
+        return JSONResponse(status_code=503, content={"error": "OpenAI functionality not available"})
+    
+    # A pending refinement would overwrite the edit, so cancel it before
+    # calling the model rather than racing it
+    if refinement == "pending":
+        with result_lock:
+            if last_generated["priorities"] is priorities and last_generated["refinement"] == "pending":
+                last_generated["refinement"] = "cancelled"
+    
+    section = regenerate_ai_section(
+        org_name, priorities, data.priority_index,
+        data.definition_index, data.instructions, data.tier
+    )
+    if section is None:
+        return JSONResponse(status_code=502, content={"error": "Failed to regenerate the section"})
+    
+    with result_lock:
+        # The refinement or a newer generation may have replaced the list
+        if last_generated["priorities"] is not priorities:
+            return JSONResponse(status_code=409, content={"error": "The generation has changed while regenerating"})
         
-        if file_path:
-            return FileResponse(
-                path=file_path,
-                filename="strategic_priorities.docx",
-                media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            )
+        # Merge the new section in place and only drop its rendered sections.
+        # The priority is replaced by a new object so renders already in
+        # progress can't put a stale section back in the cache.
+        if data.definition_index is None:
+            priorities[data.priority_index] = section
         else:
-            return {"error": "Failed to create Word document. Make sure python-docx is installed."}
-    except Exception as e:
-        print(f"Error creating Word document: {e}")
-        return {"error": "Failed to create Word document"}
+            definitions = list(priorities[data.priority_index]["definitions"])
+            definitions[data.definition_index] = section
+            priorities[data.priority_index] = dict(priorities[data.priority_index], definitions=definitions)
+        for cache in section_caches.values():
+            cache.pop(data.priority_index, None)
+        
+        result_changed(clear_sections=False)
+        priorities = list(priorities)
+    background_tasks.add_task(verify_result_links, generation_id)
+    
+    return json_response(request, {
+        "generation_id": generation_id,
+        "priority_index": data.priority_index,
+        "definition_index": data.definition_index,
+        "section": section,
+        "priorities": priorities
+    })
+
+@app.post("/verify-links")
+def verify_links_endpoint(request: Request, time_budget: float = 5.0):
+    """Check the source links of the stored result within time_budget seconds.
+    
+    Links that couldn't be checked in time are reported as "unchecked".
+    The budget is capped at LINK_CHECK_BUDGET.
+    """
+    with result_lock:
+        priorities = last_generated["priorities"]
+    if not priorities:
+        return JSONResponse(status_code=404, content={"error": "Nothing has been generated yet"})
+    
+    # A plain def runs in the threadpool, so the checks get their own event
+    # loop and the history save below doesn't block the server's loop
+    time_budget = max(0.0, min(time_budget, LINK_CHECK_BUDGET))
+    summary = asyncio.run(link_verifier.annotate_priorities(priorities, time_budget))
+    with result_lock:
+        if last_generated["priorities"] is priorities:
+            last_generated["link_check"] = summary
+            save_history(dict(last_generated))
+    
+    return json_response(request, {"link_check": summary, "priorities": priorities})
+
+@app.get("/result")
+def get_result(request: Request):
+    """Return the stored generation, including any background refinement.
+    
+    Supports If-None-Match, so clients polling for the refined result get a
+    304 until it changes.
+    """
+    return json_response(request, current_result())
+
+@app.get("/history")
+def list_history(request: Request, limit: int = 20, before: Optional[int] = None, org_name: Optional[str] = None):
+    """List stored generations, newest first.
+    
+    Pass the returned next_before as before to get the next page.
+    """
+    return json_response(request, history_store.list_generations(limit, before, org_name))
+
+@app.get("/history/search")
+def search_history(q: str, request: Request, limit: int = 20, before: Optional[int] = None):
+    """Full-text search over the priorities and definitions of stored generations."""
+    return json_response(request, history_store.search_priorities(q, limit, before))
+
+@app.get("/history/{generation_id}")
+def get_history_item(generation_id: str, request: Request):
+    """Return a stored generation with all of its priorities."""
+    record = history_store.get_generation(generation_id)
+    if record is None:
+        return JSONResponse(status_code=404, content={"error": f"Generation '{generation_id}' not found"})
+    return json_response(request, record)
+
+@app.get("/analytics/priorities")
+def analyze_priorities(
+    request: Request,
+    org_names: Optional[List[str]] = Query(None),
+    limit: Optional[int] = None,
+    top_k: int = 5,
+    clusters: int = 10
+):
+    """Compare the latest priorities of many organizations.
+    
+    Returns the most similar peers of each organization and the common
+    priority themes across them. Defaults to every organization in the
+    history; pass org_names to compare a peer group.
+    """
+    if not has_analytics:
+        return JSONResponse(status_code=503, content={"error": "Analytics not available. Make sure numpy and scipy are installed."})
+    
+    generations = history_store.latest_per_org(org_names, limit)
+    result = analytics.analyze_generations(generations, top_k=top_k, n_clusters=clusters)
+    return json_response(request, result)
+
+@app.get("/metrics/models")
+def model_metrics():
+    """Latency, token cost and validation failure rate for each model tier."""
+    return get_tier_stats()
+
+@app.get("/metrics/prerender")
+def prerender_metrics():
+    """Hit rate and wasted work of speculative Word/Excel pre-rendering."""
+    return prerender.get_stats()
 
-@app.get("/download/excel")
-async def download_excel_endpoint():
-    """Download strategic priorities as an Excel spreadsheet."""
+@app.get("/metrics/serialization")
+def serialization_metrics():
+    """Serialization and compression cost of JSON responses."""
+    return get_serialization_stats()
+
+# Fallback data for downloads requested before anything has been generated
+EXAMPLE_PRIORITIES = [
+    {
+        "priority": "Example Priority",
+        "description": "This is an example priority. Please generate priorities first.",
+        "definitions": [
+            {
+                "title": "Example Initiative:",
+                "description": "This is an example initiative.",
+                "source": "Example source"
+            }
+        ]
+    }
+]
+
+@app.get("/download/{format_name}")
+def download_endpoint(format_name: str):
+    """Download strategic priorities in any registered export format."""
     global last_generated
     
+    renderer = get_renderer(format_name)
+    if renderer is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": f"Unknown export format '{format_name}'. Available formats: {', '.join(RENDERERS)}"}
+        )
+    
+    # Use the stored organization name and priorities
+    with result_lock:
+        stored_priorities = list(last_generated["priorities"])
+        org_name = last_generated["org_name"] or "Your Organization"
+        key = result_key()
+    priorities = stored_priorities or EXAMPLE_PRIORITIES
+    headers = {"Content-Disposition": f'attachment; filename="{export_filename(format_name)}"'}
+    
+    # Serve the speculative pre-render if there is one
+    if stored_priorities and format_name in prerender.PRERENDER_FORMATS:
+        content = prerender.get(key, format_name)
+        if content is not None:
+            return Response(content=content, media_type=renderer["media_type"], headers=headers)
+    
+    print(f"Creating {format_name} export for '{org_name}' with {len(priorities)} priorities")
+    
+    # Render the first chunk up front so missing libraries and rendering
+    # errors are reported before the response starts streaming. The Word
+    # renderer builds its whole body before the first chunk, so a malformed
+    # priority fails here rather than leaving a truncated file.
+    section_cache = None
+    if stored_priorities:
+        section_cache = section_caches.setdefault(format_name, {})
+    chunks = iter_export(format_name, priorities, org_name, section_cache)
     try:
-        # Use the stored organization name and priorities
-        org_name = last_generated["org_name"]
-        if not org_name:
-            org_name = "Your Organization"
-            
-        priorities = last_generated["priorities"]
-        if not priorities:
-            # Fallback data if nothing has been generated
-            priorities = [
-                {
-                    "priority": "Example Priority",
-                    "description": "This is an example priority. Please generate priorities first.",
-                    "definitions": [
-                        {
-                            "title": "Example Initiative:",
-                            "description": "This is an example initiative.",
-                            "source": "Example source"
-                        }
-                    ]
-                }
-            ]
-        
-        print(f"Creating Excel document for '{org_name}' with {len(priorities)} priorities")
-        file_path = create_simple_excel(priorities, org_name)
-        
-        if file_path:
-            return FileResponse(
-                path=file_path,
-                filename="strategic_priorities.xlsx",
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        else:
-            return {"error": "Failed to create Excel file. Make sure openpyxl is installed."}
+        first_chunk = next(chunks, b"")
+        if not renderer["streaming"]:
+            first_chunk += b"".join(chunks)
+    except ImportError as e:
+        print(f"Missing library for {format_name} export: {e}")
+        return {"error": f"Failed to create {format_name} export. Make sure {e.name} is installed."}
     except Exception as e:
-        print(f"Error creating Excel file: {e}")
-        return {"error": "Failed to create Excel file"}
+        print(f"Error creating {format_name} export: {e}")
+        return {"error": f"Failed to create {format_name} export"}
+    
+    if not renderer["streaming"]:
+        return Response(content=first_chunk, media_type=renderer["media_type"], headers=headers)
+    
+    return StreamingResponse(
+        itertools.chain([first_chunk], chunks),
+        media_type=renderer["media_type"],
+        headers=headers
+    )
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,161 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import threading
+
+from fastapi.responses import Response
+
+# orjson is several times faster than the standard library encoder; fall
+# back to json if it isn't installed
+try:
+    import orjson
+    has_orjson = True
+except ImportError:
+    has_orjson = False
+    print("orjson not found, using the standard json encoder. Install it with 'pip install orjson'")
+
+# Brotli is optional; without it responses are only gzip compressed
+try:
+    import brotli
+    has_brotli = True
+except ImportError:
+    has_brotli = False
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_stats_lock = threading.Lock()
+_serialization_stats = {
+    "responses": 0,
+    "serialization_seconds": 0.0,
+    "compression_seconds": 0.0,
+    "bytes_serialized": 0,
+    "bytes_sent": 0,
+    "not_modified": 0,
+    "encodings": {},
+}
+
+
+def dumps(content):
+    """Serialize content to JSON bytes."""
+    if has_orjson:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _record(serialization_seconds, size, compression_seconds=0.0, sent=None, encoding="identity", not_modified=False):
+    with _stats_lock:
+        stats = _serialization_stats
+        stats["responses"] += 1
+        stats["serialization_seconds"] += serialization_seconds
+        stats["compression_seconds"] += compression_seconds
+        stats["bytes_serialized"] += size
+        stats["bytes_sent"] += size if sent is None else sent
+        if not_modified:
+            stats["not_modified"] += 1
+        else:
+            stats["encodings"][encoding] = stats["encodings"].get(encoding, 0) + 1
+
+
+def get_serialization_stats():
+    """Return the serialization and compression cost per response."""
+    with _stats_lock:
+        stats = dict(_serialization_stats)
+        stats["encodings"] = dict(stats["encodings"])
+    responses = stats["responses"]
+    stats["json_library"] = "orjson" if has_orjson else "json"
+    stats["brotli_available"] = has_brotli
+    stats["avg_serialization_ms"] = round(stats["serialization_seconds"] * 1000 / responses, 3) if responses else None
+    stats["avg_compression_ms"] = round(stats["compression_seconds"] * 1000 / responses, 3) if responses else None
+    stats["compression_ratio"] = round(stats["bytes_sent"] / stats["bytes_serialized"], 3) if stats["bytes_serialized"] else None
+    return stats
+
+
+class FastJSONResponse(Response):
+    """JSON response serialized with orjson, recording serialization cost."""
+    media_type = "application/json"
+
+    def render(self, content):
+        start_time = time.perf_counter()
+        body = dumps(content)
+        _record(time.perf_counter() - start_time, len(body))
+        return body
+
+
+def _accepted_encodings(accept_encoding):
+    """Parse an Accept-Encoding header into {encoding: quality}."""
+    encodings = {}
+    for item in accept_encoding.split(","):
+        parts = item.strip().split(";")
+        name = parts[0].strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best supported content encoding for a request."""
+    encodings = _accepted_encodings(accept_encoding or "")
+    wildcard = encodings.get("*", 0.0)
+    candidates = ["br", "gzip"] if has_brotli else ["gzip"]
+    best = None
+    best_quality = 0.0
+    for encoding in candidates:
+        quality = encodings.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def json_response(request, content, status_code=200):
+    """Serialize content with an ETag, honouring If-None-Match and Accept-Encoding."""
+    start_time = time.perf_counter()
+    body = dumps(content)
+    serialization_seconds = time.perf_counter() - start_time
+
+    # Weak ETag: the same JSON is equivalent whatever the content encoding
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+
+    # A 304 only makes sense for safe reads; a POST with If-None-Match must
+    # still run and return its body
+    if_none_match = None
+    if request.method in ("GET", "HEAD"):
+        if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        if "*" in tags or etag in tags or etag[2:] in tags:
+            _record(serialization_seconds, len(body), sent=0, not_modified=True)
+            return Response(status_code=304, headers=headers)
+
+    encoding = None
+    if len(body) >= COMPRESSION_MIN_SIZE:
+        encoding = choose_encoding(request.headers.get("accept-encoding"))
+
+    compression_seconds = 0.0
+    if encoding:
+        start_time = time.perf_counter()
+        if encoding == "br":
+            payload = brotli.compress(body, quality=BROTLI_QUALITY)
+        else:
+            payload = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        compression_seconds = time.perf_counter() - start_time
+        headers["Content-Encoding"] = encoding
+    else:
+        payload = body
+
+    _record(serialization_seconds, len(body), compression_seconds, len(payload), encoding or "identity")
+    return Response(content=payload, status_code=status_code, media_type="application/json", headers=headers)
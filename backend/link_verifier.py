@@ -0,0 +1,257 @@
+import os
+import re
+import time
+import socket
+import asyncio
+import ipaddress
+import threading
+from urllib.parse import urlsplit
+
+import httpx
+import httpcore
+
+# Checks that the source URLs of generated definitions are alive. All URLs of
+# a generation are checked concurrently over one pooled async client, with a
+# limit per host, and results are cached for LINK_CACHE_TTL seconds.
+LINK_TIMEOUT = float(os.getenv("LINK_TIMEOUT", "5"))
+LINK_CACHE_TTL = float(os.getenv("LINK_CACHE_TTL", "3600"))
+# Failures are re-checked sooner, they are often transient
+LINK_FAILURE_TTL = float(os.getenv("LINK_FAILURE_TTL", "300"))
+LINK_MAX_CONNECTIONS = int(os.getenv("LINK_MAX_CONNECTIONS", "20"))
+LINK_PER_HOST_LIMIT = int(os.getenv("LINK_PER_HOST_LIMIT", "4"))
+LINK_MAX_REDIRECTS = int(os.getenv("LINK_MAX_REDIRECTS", "5"))
+# Sources come from model output, so by default links that resolve to
+# loopback, private, link-local or other non-public addresses are not
+# fetched. Only enable this for local testing.
+LINK_ALLOW_PRIVATE = os.getenv("LINK_ALLOW_PRIVATE", "false").lower() in ("1", "true", "yes")
+LINK_CACHE_SIZE = 10000
+
+USER_AGENT = "strategic-priorities-link-checker/1.0"
+
+# HEAD responses that usually mean "HEAD not supported", retried with GET
+_HEAD_FALLBACK_STATUSES = {403, 405, 501}
+_DOMAIN = re.compile(r"^[\w-]+(\.[\w-]+)+(/|$)")
+
+_cache_lock = threading.Lock()
+# url -> (result, expires_at)
+_cache = {}
+
+
+def normalize_url(source):
+    """Return the http(s) URL for a definition source, or None if it isn't one."""
+    if not source or not isinstance(source, str):
+        return None
+    source = source.strip()
+    if not re.match(r"^https?://", source, re.IGNORECASE):
+        if not _DOMAIN.match(source):
+            return None
+        source = "https://" + source
+    parts = urlsplit(source)
+    if not parts.hostname:
+        return None
+    return source
+
+
+class BlockedAddress(Exception):
+    """Raised for a link whose host resolves to a non-public address."""
+
+
+def _is_public(address):
+    address = ipaddress.ip_address(address.split("%")[0])
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return address.is_global and not address.is_multicast
+
+
+async def _resolve(host, port, timeout=None):
+    """Return the addresses of a host, in the order the resolver gives them."""
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await asyncio.wait_for(loop.getaddrinfo(host, port, type=socket.SOCK_STREAM), timeout)
+    except asyncio.TimeoutError:
+        raise httpcore.ConnectTimeout(f"Timed out resolving {host}")
+    except socket.gaierror as e:
+        raise httpcore.ConnectError(str(e))
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+
+class _PublicAddressBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that resolves each host once, rejects it unless every
+    address is public, and then connects to one of the addresses it checked.
+
+    Checking and connecting to the same addresses means a DNS answer that
+    changes between the two (DNS rebinding) can't reach a blocked address.
+    Every connection goes through here, including redirect hops.
+    """
+
+    def __init__(self):
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        addresses = await _resolve(host, port, timeout)
+        if not LINK_ALLOW_PRIVATE and not all(_is_public(address) for address in addresses):
+            raise BlockedAddress(host)
+        error = None
+        for address in addresses:
+            try:
+                # TLS still verifies the certificate against the original host name
+                return await self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        raise error
+
+    async def sleep(self, seconds):
+        await self._backend.sleep(seconds)
+
+
+class _PublicAddressTransport(httpx.AsyncHTTPTransport):
+    """HTTP transport whose connections all go through _PublicAddressBackend."""
+
+    def __init__(self, limits):
+        super().__init__(limits=limits)
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=_PublicAddressBackend(),
+        )
+
+
+def _cached(url):
+    with _cache_lock:
+        entry = _cache.get(url)
+        if entry is None:
+            return None
+        result, expires_at = entry
+        if expires_at < time.monotonic():
+            del _cache[url]
+            return None
+        return result
+
+
+def _store(url, result):
+    ttl = LINK_CACHE_TTL if result["status"] == "ok" else LINK_FAILURE_TTL
+    with _cache_lock:
+        if len(_cache) >= LINK_CACHE_SIZE:
+            # Drop the entry that expires first
+            del _cache[min(_cache, key=lambda key: _cache[key][1])]
+        _cache[url] = (result, time.monotonic() + ttl)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def _result_for_status(status_code):
+    if status_code < 400:
+        status = "ok"
+    elif status_code in (404, 410):
+        status = "broken"
+    else:
+        status = "error"
+    return {"status": status, "http_status": status_code}
+
+
+async def _check_url(client, url, host_limits):
+    host = urlsplit(url).hostname
+    semaphore = host_limits.setdefault(host, asyncio.Semaphore(LINK_PER_HOST_LIMIT))
+    async with semaphore:
+        error = None
+        blocked = False
+        try:
+            response = await client.head(url)
+            status_code = response.status_code
+        except httpx.RemoteProtocolError:
+            # Some servers drop HEAD requests entirely
+            status_code = 405
+        except BlockedAddress:
+            status_code, blocked = None, True
+        except (httpx.HTTPError, httpx.InvalidURL) as e:
+            status_code, error = None, type(e).__name__
+
+        if status_code in _HEAD_FALLBACK_STATUSES:
+            try:
+                # Only the status is needed, so don't download the body
+                async with client.stream("GET", url) as response:
+                    status_code = response.status_code
+            except BlockedAddress:
+                status_code, blocked = None, True
+            except (httpx.HTTPError, httpx.InvalidURL) as e:
+                status_code, error = None, type(e).__name__
+
+    if blocked:
+        result = {"status": "blocked", "http_status": None}
+    elif status_code is None:
+        result = {"status": "unreachable", "http_status": None, "error": error}
+    else:
+        result = _result_for_status(status_code)
+    result["checked_at"] = time.time()
+    _store(url, result)
+    return result
+
+
+async def verify_urls(urls, time_budget=None):
+    """Check a collection of URLs concurrently.
+
+    Returns {url: result}. URLs still being checked when time_budget
+    (seconds) runs out get the status "unchecked" and are not cached.
+    """
+    results = {}
+    to_check = []
+    for url in dict.fromkeys(urls):
+        cached = _cached(url)
+        if cached is not None:
+            results[url] = cached
+        else:
+            to_check.append(url)
+
+    if not to_check:
+        return results
+
+    host_limits = {}
+    limits = httpx.Limits(max_connections=LINK_MAX_CONNECTIONS, max_keepalive_connections=LINK_MAX_CONNECTIONS)
+    async with httpx.AsyncClient(
+        transport=_PublicAddressTransport(limits),
+        timeout=LINK_TIMEOUT,
+        follow_redirects=True,
+        max_redirects=LINK_MAX_REDIRECTS,
+        headers={"User-Agent": USER_AGENT},
+        # A proxy would connect on our behalf and bypass the address check
+        trust_env=False
+    ) as client:
+        tasks = {asyncio.ensure_future(_check_url(client, url, host_limits)): url for url in to_check}
+        done, pending = await asyncio.wait(tasks, timeout=time_budget)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    for task, url in tasks.items():
+        if task in done and not task.cancelled() and task.exception() is None:
+            results[url] = task.result()
+        else:
+            results[url] = {"status": "unchecked", "http_status": None}
+    return results
+
+
+async def annotate_priorities(priorities, time_budget=None):
+    """Check every definition source and set its "link_status".
+
+    Returns a count of definitions per link status.
+    """
+    definitions = [definition for priority in priorities for definition in priority.get("definitions", [])]
+    urls = {id(definition): normalize_url(definition.get("source")) for definition in definitions}
+    results = await verify_urls([url for url in urls.values() if url], time_budget)
+
+    summary = {}
+    for definition in definitions:
+        url = urls[id(definition)]
+        if url is None:
+            link_status = {"status": "not_a_url", "http_status": None}
+        else:
+            link_status = dict(results[url], url=url)
+        definition["link_status"] = link_status
+        summary[link_status["status"]] = summary.get(link_status["status"], 0) + 1
+    return summary
@@ -1,9 +1,13 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
 from ai_processing import generate_strategic_priorities
-from file_downloads import create_word, create_excel
+from export_renderers import RENDERERS, get_renderer, iter_export, export_filename
 
 app = FastAPI()
 
+# Last generated result, used by the download endpoints
+last_generated = {"org_name": "", "priorities": []}
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Strategic Priorities Generator API"}
@@ -11,12 +15,17 @@ def read_root():
 @app.post("/generate")
 def generate_priorities(org_name: str, org_website: str):
     priorities = generate_strategic_priorities(org_name, org_website)
+    last_generated["org_name"] = org_name
+    last_generated["priorities"] = priorities or []
     return {"priorities": priorities}
 
-@app.get("/download/word")
-def download_word():
-    return create_word()
-
-@app.get("/download/excel")
-def download_excel():
-    return create_excel()
+@app.get("/download/{format_name}")
+def download(format_name: str):
+    renderer = get_renderer(format_name)
+    if renderer is None:
+        return JSONResponse(status_code=404, content={"error": f"Unknown export format. Available formats: {', '.join(RENDERERS)}"})
+    return StreamingResponse(
+        iter_export(format_name, last_generated["priorities"], last_generated["org_name"] or "Your Organization"),
+        media_type=renderer["media_type"],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(format_name)}"'}
+    )
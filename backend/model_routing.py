@@ -0,0 +1,123 @@
+import os
+import threading
+
+# Model tiers used for generation. The draft tier is a fast, cheap model whose
+# result is returned immediately; the refine tier is the larger model used for
+# the optional refinement pass. Both can be overridden from the environment.
+MODEL_TIERS = {
+    "draft": {
+        "model": os.getenv("DRAFT_MODEL", "gpt-3.5-turbo"),
+        "max_tokens": int(os.getenv("DRAFT_MAX_TOKENS", "3500")),
+        # USD per 1K tokens (prompt, completion)
+        "prompt_cost": float(os.getenv("DRAFT_PROMPT_COST", "0.0005")),
+        "completion_cost": float(os.getenv("DRAFT_COMPLETION_COST", "0.0015")),
+    },
+    "refine": {
+        "model": os.getenv("REFINE_MODEL", "gpt-4"),
+        "max_tokens": int(os.getenv("REFINE_MAX_TOKENS", "3500")),
+        "prompt_cost": float(os.getenv("REFINE_PROMPT_COST", "0.03")),
+        "completion_cost": float(os.getenv("REFINE_COMPLETION_COST", "0.06")),
+    },
+}
+
+# Available routes:
+#   fast         - draft tier only
+#   quality      - refine tier only (the original behaviour)
+#   draft_refine - return the draft, then refine in the background. Opt-in:
+#                  clients must poll /result to see the refined priorities,
+#                  otherwise downloads differ from what was shown.
+ROUTES = ("fast", "quality", "draft_refine")
+DEFAULT_ROUTE = os.getenv("MODEL_ROUTE_POLICY", "quality")
+
+_stats_lock = threading.Lock()
+_tier_stats = {}
+
+
+def resolve_route(requested_route=None):
+    """Pick the route for a request, falling back to the configured policy."""
+    if requested_route in ROUTES:
+        return requested_route
+    if requested_route:
+        print(f"Unknown model route '{requested_route}', using '{DEFAULT_ROUTE}'")
+    if DEFAULT_ROUTE in ROUTES:
+        return DEFAULT_ROUTE
+    return "quality"
+
+
+def validate_priorities(priorities):
+    """Check that a parsed model response has the expected priorities shape."""
+    if not isinstance(priorities, list) or not priorities:
+        return False
+    for priority in priorities:
+        if not isinstance(priority, dict):
+            return False
+        if not priority.get("priority") or not isinstance(priority.get("description"), str):
+            return False
+        definitions = priority.get("definitions")
+        if not isinstance(definitions, list) or not definitions:
+            return False
+        for definition in definitions:
+            if not isinstance(definition, dict):
+                return False
+            if not definition.get("title") or not isinstance(definition.get("description"), str):
+                return False
+    return True
+
+
+def record_call(tier, latency, prompt_tokens=0, completion_tokens=0, valid=True, error=False):
+    """Record latency, token usage and validation outcome for one model call.
+
+    Pass error=True for calls that got no response (API errors, timeouts).
+    They are counted separately and kept out of the latency and validation
+    stats, which only describe the responses the model returned.
+    """
+    config = MODEL_TIERS[tier]
+    cost = (prompt_tokens * config["prompt_cost"] + completion_tokens * config["completion_cost"]) / 1000
+
+    with _stats_lock:
+        stats = _tier_stats.setdefault(tier, {
+            "calls": 0,
+            "errors": 0,
+            "validation_failures": 0,
+            "total_latency": 0.0,
+            "max_latency": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_cost": 0.0,
+        })
+        stats["calls"] += 1
+        if error:
+            stats["errors"] += 1
+            return
+        stats["total_latency"] += latency
+        stats["max_latency"] = max(stats["max_latency"], latency)
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        stats["total_cost"] += cost
+        if not valid:
+            stats["validation_failures"] += 1
+
+
+def get_tier_stats():
+    """Return a summary of the recorded stats for every tier."""
+    summary = {}
+    with _stats_lock:
+        for tier, config in MODEL_TIERS.items():
+            stats = _tier_stats.get(tier)
+            calls = stats["calls"] if stats else 0
+            errors = stats["errors"] if stats else 0
+            responses = calls - errors
+            summary[tier] = {
+                "model": config["model"],
+                "calls": calls,
+                "errors": errors,
+                "error_rate": round(errors / calls, 3) if calls else None,
+                "avg_latency": round(stats["total_latency"] / responses, 3) if responses else None,
+                "max_latency": round(stats["max_latency"], 3) if responses else None,
+                "prompt_tokens": stats["prompt_tokens"] if stats else 0,
+                "completion_tokens": stats["completion_tokens"] if stats else 0,
+                "total_cost": round(stats["total_cost"], 6) if stats else 0.0,
+                "avg_cost": round(stats["total_cost"] / responses, 6) if responses else None,
+                "validation_failure_rate": round(stats["validation_failures"] / responses, 3) if responses else None,
+            }
+    return {"default_route": resolve_route(), "tiers": summary}
@@ -0,0 +1,168 @@
+import os
+import time
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from export_renderers import get_renderer, iter_export
+
+# Speculative pre-rendering: almost every generation is followed by a Word or
+# Excel download, so both are rendered in the background as soon as a result
+# is stored. Only the renders of the current result are kept; they are
+# dropped as soon as it changes.
+PRERENDER_FORMATS = [f.strip() for f in os.getenv("PRERENDER_FORMATS", "word,excel").split(",") if f.strip()]
+PRERENDER_WORKERS = int(os.getenv("PRERENDER_WORKERS", "2"))
+# Skip pre-rendering when the 1-minute load average per CPU is above this
+PRERENDER_MAX_LOAD = float(os.getenv("PRERENDER_MAX_LOAD", "0.8"))
+
+_executor = ThreadPoolExecutor(max_workers=PRERENDER_WORKERS, thread_name_prefix="prerender")
+_lock = threading.Lock()
+# (result_key, format) -> {"content": bytes, "seconds": float, "hits": int}
+_cache = {}
+# (result_key, format) -> Future
+_pending = {}
+_current_key = None
+
+_stats = {
+    "scheduled": 0,
+    "skipped_cpu": 0,
+    "completed": 0,
+    "cancelled": 0,
+    "failed": 0,
+    "hits": 0,
+    "misses": 0,
+    "wasted": 0,
+    "render_seconds": 0.0,
+    "wasted_seconds": 0.0,
+}
+
+
+def cpu_under_pressure():
+    """Return True if the machine is too busy for speculative work."""
+    try:
+        load = os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return False
+    return load / (os.cpu_count() or 1) > PRERENDER_MAX_LOAD
+
+
+def _drop(entry):
+    """Account for a cache entry that is removed; unused renders are wasted work."""
+    if entry["hits"] == 0:
+        _stats["wasted"] += 1
+        _stats["wasted_seconds"] += entry["seconds"]
+
+
+def _render(result_key, format_name, priorities, org_name, section_cache):
+    start_time = time.perf_counter()
+    try:
+        content = b"".join(iter_export(format_name, priorities, org_name, section_cache))
+    except Exception as e:
+        print(f"Pre-render of {format_name} export failed: {e}")
+        with _lock:
+            _stats["failed"] += 1
+            _pending.pop((result_key, format_name), None)
+        return None
+    seconds = time.perf_counter() - start_time
+
+    entry = {"content": content, "seconds": seconds, "hits": 0}
+    with _lock:
+        _stats["completed"] += 1
+        _stats["render_seconds"] += seconds
+        _pending.pop((result_key, format_name), None)
+
+        # The result changed while this was rendering
+        if result_key != _current_key:
+            _drop(entry)
+            return content
+
+        _cache[(result_key, format_name)] = entry
+    return content
+
+
+def invalidate():
+    """Cancel and drop every pre-render of the previous result."""
+    global _current_key
+    with _lock:
+        _current_key = None
+        for future in _pending.values():
+            if future.cancel():
+                _stats["cancelled"] += 1
+        _pending.clear()
+        for entry in _cache.values():
+            _drop(entry)
+        _cache.clear()
+
+
+def schedule(result_key, priorities, org_name, section_caches=None):
+    """Pre-render the stored result in the background, replacing older pre-renders.
+
+    result_key must change whenever the result changes. section_caches maps
+    format names to the section cache of formats rendered by section, so
+    after an edit only the changed priorities are rendered again.
+    """
+    global _current_key
+    invalidate()
+    with _lock:
+        _current_key = result_key
+
+    if cpu_under_pressure():
+        print("Skipping pre-render: CPU under pressure")
+        with _lock:
+            _stats["skipped_cpu"] += 1
+        return
+
+    # Edits replace whole priorities, so a copy of the list is a stable snapshot
+    snapshot = list(priorities)
+    with _lock:
+        for format_name in PRERENDER_FORMATS:
+            renderer = get_renderer(format_name)
+            section_cache = None
+            if section_caches is not None and renderer and renderer["sections"]:
+                section_cache = section_caches.setdefault(format_name, {})
+            future = _executor.submit(_render, result_key, format_name, snapshot, org_name, section_cache)
+            _pending[(result_key, format_name)] = future
+            _stats["scheduled"] += 1
+
+
+def get(result_key, format_name):
+    """Return the pre-rendered bytes for a result, waiting for an in-flight render.
+
+    Returns None on a miss.
+    """
+    with _lock:
+        entry = _cache.get((result_key, format_name))
+        if entry is not None:
+            entry["hits"] += 1
+            _stats["hits"] += 1
+            return entry["content"]
+        future = _pending.get((result_key, format_name))
+
+    if future is not None:
+        try:
+            content = future.result()
+        except CancelledError:
+            content = None
+        with _lock:
+            entry = _cache.get((result_key, format_name))
+            if entry is not None:
+                entry["hits"] += 1
+            if content is not None:
+                _stats["hits"] += 1
+                return content
+
+    with _lock:
+        _stats["misses"] += 1
+    return None
+
+
+def get_stats():
+    """Return pre-render hit rate and wasted work."""
+    with _lock:
+        stats = dict(_stats)
+        stats["cached"] = len(_cache)
+        stats["in_flight"] = len(_pending)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+    stats["wasted_rate"] = round(stats["wasted"] / stats["completed"], 3) if stats["completed"] else None
+    stats["formats"] = PRERENDER_FORMATS
+    return stats
@@ -1,12 +1,13 @@
 from fastapi import FastAPI, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import os
 
 # Import your existing functionality
 from ai_processing import generate_strategic_priorities
 from file_downloads import create_word, create_excel
+from export_renderers import RENDERERS, get_renderer, iter_export, export_filename
 
 class OrgData(BaseModel):
     org_name: str
@@ -14,6 +15,9 @@ class OrgData(BaseModel):
 
 app = FastAPI()
 
+# Last generated result, used by the download endpoints
+last_generated = {"org_name": "", "priorities": []}
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -33,6 +37,8 @@ async def generate_priorities_endpoint(data: OrgData):
     try:
         # Use your AI-powered function
         priorities = generate_strategic_priorities(data.org_name, data.org_website)
+        last_generated["org_name"] = data.org_name
+        last_generated["priorities"] = priorities or []
         return {"priorities": priorities}
     except Exception as e:
         # If there's an error with the AI, fall back to mock data
@@ -52,13 +58,15 @@ async def generate_priorities_endpoint(data: OrgData):
             },
             # ... other priorities ...
         ]
+        last_generated["org_name"] = data.org_name
+        last_generated["priorities"] = priorities
         return {"priorities": priorities}
 
 @app.get("/download/word")
 async def download_word_endpoint():
     # Call your existing word creation function
     try:
-        file_path = create_word()
+        file_path = create_word(last_generated["priorities"], last_generated["org_name"] or "Your Organization")
         return FileResponse(
             path=file_path,
             filename="strategic_priorities.docx",
@@ -72,7 +80,7 @@ async def download_word_endpoint():
 async def download_excel_endpoint():
     # Call your existing excel creation function
     try:
-        file_path = create_excel()
+        file_path = create_excel(last_generated["priorities"], last_generated["org_name"] or "Your Organization")
         return FileResponse(
             path=file_path,
             filename="strategic_priorities.xlsx",
@@ -82,6 +90,18 @@ async def download_excel_endpoint():
         print(f"Error creating Excel document: {e}")
         return {"error": "Failed to create Excel document"}
 
+@app.get("/download/{format_name}")
+async def download_endpoint(format_name: str):
+    # Any other registered export format (csv, ndjson, markdown, pdf)
+    renderer = get_renderer(format_name)
+    if renderer is None:
+        return JSONResponse(status_code=404, content={"error": f"Unknown export format. Available formats: {', '.join(RENDERERS)}"})
+    return StreamingResponse(
+        iter_export(format_name, last_generated["priorities"], last_generated["org_name"] or "Your Organization"),
+        media_type=renderer["media_type"],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(format_name)}"'}
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
@@ -0,0 +1,154 @@
+import time
+import socket
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import link_verifier
+
+
+class Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, send_body):
+        Handler.requests.append((self.command, self.path))
+        if self.path == "/ok":
+            status = 200
+        elif self.path == "/missing":
+            status = 404
+        elif self.path == "/no-head":
+            status = 405 if self.command == "HEAD" else 200
+        elif self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/ok")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        elif self.path == "/to-private":
+            self.send_response(302)
+            self.send_header("Location", f"http://127.0.0.2:{self.server.server_address[1]}/ok")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        elif self.path == "/slow":
+            time.sleep(2)
+            status = 200
+        else:
+            status = 500
+        body = b"hello"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(link_verifier, "LINK_ALLOW_PRIVATE", True)
+    link_verifier.clear_cache()
+    Handler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    link_verifier.clear_cache()
+
+
+def verify(*urls, time_budget=None):
+    return asyncio.run(link_verifier.verify_urls(list(urls), time_budget))
+
+
+def test_ok_and_broken(server):
+    results = verify(f"{server}/ok", f"{server}/missing")
+    assert results[f"{server}/ok"]["status"] == "ok"
+    assert results[f"{server}/ok"]["http_status"] == 200
+    assert results[f"{server}/missing"]["status"] == "broken"
+    assert results[f"{server}/missing"]["http_status"] == 404
+
+
+def test_head_not_allowed_falls_back_to_get(server):
+    result = verify(f"{server}/no-head")[f"{server}/no-head"]
+    assert result["status"] == "ok"
+    assert ("HEAD", "/no-head") in Handler.requests
+    assert ("GET", "/no-head") in Handler.requests
+
+
+def test_redirect_is_followed(server):
+    result = verify(f"{server}/redirect")[f"{server}/redirect"]
+    assert result["status"] == "ok"
+    assert ("HEAD", "/ok") in Handler.requests
+
+
+def test_slow_link_is_unchecked_within_budget(server):
+    start_time = time.monotonic()
+    result = verify(f"{server}/slow", time_budget=0.5)[f"{server}/slow"]
+    assert time.monotonic() - start_time < 1.5
+    assert result["status"] == "unchecked"
+    # Unfinished checks are not cached
+    assert link_verifier._cached(f"{server}/slow") is None
+
+
+def test_refused_connection_is_unreachable(server):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    url = f"http://127.0.0.1:{port}/"
+    result = verify(url)[url]
+    assert result["status"] == "unreachable"
+    assert result["error"] == "ConnectError"
+
+
+def test_results_are_cached(server):
+    first = verify(f"{server}/ok")[f"{server}/ok"]
+    request_count = len(Handler.requests)
+    second = verify(f"{server}/ok")[f"{server}/ok"]
+    assert len(Handler.requests) == request_count
+    assert second == first
+
+
+def test_private_addresses_are_blocked_by_default(server, monkeypatch):
+    monkeypatch.setattr(link_verifier, "LINK_ALLOW_PRIVATE", False)
+    urls = [f"{server}/ok", "http://localhost/", "http://169.254.169.254/latest/meta-data/", "http://10.0.0.1/"]
+    results = verify(*urls)
+    assert [results[url]["status"] for url in urls] == ["blocked"] * len(urls)
+    assert Handler.requests == []
+
+
+def test_connects_to_the_checked_address(server, monkeypatch):
+    port = server.rsplit(":", 1)[1]
+    resolved = []
+
+    async def resolve(host, port, timeout=None):
+        resolved.append(host)
+        return ["127.0.0.1"]
+
+    # The host only exists in the checker's own lookup, so the request can
+    # only succeed by connecting to the address that lookup returned
+    monkeypatch.setattr(link_verifier, "_resolve", resolve)
+    url = f"http://rebind.invalid:{port}/ok"
+    assert verify(url)[url]["status"] == "ok"
+    assert resolved == ["rebind.invalid"]
+
+
+def test_redirect_to_private_address_is_blocked(server, monkeypatch):
+    monkeypatch.setattr(link_verifier, "LINK_ALLOW_PRIVATE", False)
+    monkeypatch.setattr(link_verifier, "_is_public", lambda address: address == "127.0.0.1")
+    result = verify(f"{server}/to-private")[f"{server}/to-private"]
+    assert result["status"] == "blocked"
+    assert ("HEAD", "/to-private") in Handler.requests
+    assert ("HEAD", "/ok") not in Handler.requests